@@ -5,7 +5,7 @@ from __future__ import annotations
 
 import abc
 from pathlib import Path
-from typing import TYPE_CHECKING, ClassVar
+from typing import TYPE_CHECKING, Callable, ClassVar
 
 from kraken.std.python.pyproject import Pyproject
 
@@ -92,3 +92,23 @@ def detect_build_system(project_directory: Path) -> PythonBuildSystem | None:
         return PoetryPythonBuildSystem(project_directory)
 
     return None
+
+
+def get_build_system(name: str, project_directory: Path) -> PythonBuildSystem:
+    """Create the Python build system with the given *name* (`"poetry"` or `"slap"`) for *project_directory*.
+
+    :raise ValueError: If *name* is not a known build system.
+    """
+
+    from .poetry import PoetryPythonBuildSystem
+    from .slap import SlapPythonBuildSystem
+
+    factories: dict[str, Callable[[Path], PythonBuildSystem]] = {
+        "poetry": PoetryPythonBuildSystem,
+        "slap": SlapPythonBuildSystem,
+    }
+    try:
+        factory = factories[name.lower()]
+    except KeyError:
+        raise ValueError(f"unknown Python build system {name!r}, expected one of {sorted(factories)}")
+    return factory(project_directory)
@@ -2,14 +2,20 @@
 
 from __future__ import annotations
 
+import base64
+import functools
+import hashlib
+import json
 import logging
 import os
+import re
 import shutil
 import subprocess as sp
-from concurrent.futures import ThreadPoolExecutor
+import sys
 from pathlib import Path
+from typing import Any
 
-from kraken.core.util.helpers import NotSet
+import tomli
 from kraken.core.util.path import is_relative_to
 from nr.python.environment.virtualenv import get_current_venv
 
@@ -20,6 +26,14 @@ from . import ManagedEnvironment, PythonBuildSystem
 
 logger = logging.getLogger(__name__)
 
+#: Caches the Poetry environment path per project directory for the lifetime of the process, such that only the
+#: first task that needs the environment pays the cost of discovering it. Invalidated when the environment is
+#: (re-)installed.
+_ENV_CACHE: dict[Path, Path | None] = {}
+
+#: The number of seconds after which we give up waiting for Poetry to tell us about the project's environment.
+_POETRY_ENV_TIMEOUT = 10
+
 
 class PoetryPythonBuildSystem(PythonBuildSystem):
     name = "Poetry"
@@ -85,28 +99,28 @@ class PoetryPythonBuildSystem(PythonBuildSystem):
 class PoetryManagedEnvironment(ManagedEnvironment):
     def __init__(self, project_directory: Path) -> None:
         self.project_directory = project_directory
-        self._env_path: Path | None | NotSet = NotSet.Value
 
     def _get_current_poetry_environment_path(self) -> Path | None:
         """Uses `poetry env info -p`. This will not work if Poetry has to fall back to a compatible Python
         version if the version that Poetry is installed into is not compatible."""
 
-        # Ensure we de-activate any environment that might be active when Kraken is invoked. Otherwise,
-        # Poetry would fall back to that environment.
-        environ = os.environ.copy()
-        venv = get_current_venv(environ)
-        if venv:
-            venv.deactivate(environ)
-
         command = ["poetry", "env", "info", "-p"]
         try:
-            response = sp.check_output(command, cwd=self.project_directory, env=environ).decode().strip()
-        except sp.CalledProcessError as exc:
-            if exc.returncode != 1:
-                raise
+            result = sp.run(
+                command,
+                cwd=self.project_directory,
+                env=_get_deactivated_environ(),
+                capture_output=True,
+                timeout=_POETRY_ENV_TIMEOUT,
+            )
+        except sp.TimeoutExpired:
+            logger.warning("%s did not answer within %s seconds", command, _POETRY_ENV_TIMEOUT)
+            return None
+        if result.returncode == 0:
+            return Path(result.stdout.decode().strip())
+        if result.returncode == 1:
             return None
-        else:
-            return Path(response)
+        raise sp.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
 
     def _get_all_poetry_known_environment_paths(self) -> list[Path]:
         """Uses `poetry env list --full-path` to get the path to all relevant virtual environments that are known
@@ -114,15 +128,38 @@ class PoetryManagedEnvironment(ManagedEnvironment):
 
         command = ["poetry", "env", "list", "--full-path"]
         try:
-            response = sp.check_output(command, cwd=self.project_directory).decode().strip().splitlines()
-        except sp.CalledProcessError as exc:
-            if exc.returncode != 1:
-                raise
+            result = sp.run(command, cwd=self.project_directory, capture_output=True, timeout=_POETRY_ENV_TIMEOUT)
+        except sp.TimeoutExpired:
+            logger.warning("%s did not answer within %s seconds", command, _POETRY_ENV_TIMEOUT)
             return []
-        else:
-            return [Path(line) for line in response if line]
+        if result.returncode == 0:
+            return [Path(line) for line in result.stdout.decode().strip().splitlines() if line]
+        if result.returncode == 1:
+            return []
+        raise sp.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
 
     def _get_poetry_environment_path(self) -> Path | None:
+        # Try to find the environment without invoking Poetry first, as that is significantly faster.
+        venv_path = _find_poetry_environment_path(self.project_directory)
+        if venv_path is not None:
+            logger.debug("Found Poetry environment without invoking Poetry (%s)", venv_path)
+            return venv_path
+
+        # Next, check if we've asked Poetry in a previous build and the project hasn't changed since.
+        cache_key = _get_env_cache_key(self.project_directory)
+        venv_path = _read_env_cache_file(self.project_directory, cache_key)
+        if venv_path is not None:
+            logger.debug("Using Poetry environment from the cache (%s)", venv_path)
+            return venv_path
+
+        venv_path = self._query_poetry_environment_path()
+        if venv_path is not None:
+            _write_env_cache_file(self.project_directory, cache_key, venv_path)
+        return venv_path
+
+    def _query_poetry_environment_path(self) -> Path | None:
+        from concurrent.futures import ThreadPoolExecutor
+
         # Run the two Poetry commands we need to run in parallel to improve load times.
         with ThreadPoolExecutor() as executor:
             venv_path_future = executor.submit(self._get_current_poetry_environment_path)
@@ -149,13 +186,203 @@ class PoetryManagedEnvironment(ManagedEnvironment):
             return False
 
     def get_path(self) -> Path:
-        if self._env_path is NotSet.Value:
-            self._env_path = self._get_poetry_environment_path()
-        if self._env_path is None:
+        if self.project_directory not in _ENV_CACHE:
+            _ENV_CACHE[self.project_directory] = self._get_poetry_environment_path()
+        env_path = _ENV_CACHE[self.project_directory]
+        if env_path is None:
             raise RuntimeError("managed environment does not exist")
-        return self._env_path
+        return env_path
 
     def install(self, settings: PythonSettings) -> None:
         command = ["poetry", "install", "--no-interaction"]
         logger.info("%s", command)
+        _ENV_CACHE.pop(self.project_directory, None)
         sp.check_call(command, cwd=self.project_directory)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_deactivated_environ() -> dict[str, str]:
+    """Returns a copy of the environment of the current process with any virtual environment that might be active
+    when Kraken is invoked de-activated. Otherwise, Poetry would fall back to that environment. The result is
+    computed only once and must not be modified."""
+
+    environ = os.environ.copy()
+    venv = get_current_venv(environ)
+    if venv:
+        venv.deactivate(environ)
+    return environ
+
+
+def _get_user_cache_dir() -> Path:
+    """Returns the platform's directory for user specific cache files."""
+
+    if os.name == "nt":
+        return Path(os.getenv("LOCALAPPDATA", "~/AppData/Local")).expanduser()
+    if sys.platform == "darwin":
+        return Path("~/Library/Caches").expanduser()
+    return Path(os.getenv("XDG_CACHE_HOME") or "~/.cache").expanduser()
+
+
+def _get_platform_cache_dir() -> Path:
+    """Returns the default Poetry cache directory (the same that `platformdirs.user_cache_path()` would return)."""
+
+    if os.name == "nt":
+        return _get_user_cache_dir() / "pypoetry" / "Cache"
+    return _get_user_cache_dir() / "pypoetry"
+
+
+def _get_platform_config_dir() -> Path:
+    """Returns the Poetry configuration directory (the same that `platformdirs.user_config_path()` would return)."""
+
+    if os.getenv("POETRY_CONFIG_DIR"):
+        return Path(os.environ["POETRY_CONFIG_DIR"]).expanduser()
+    if os.name == "nt":
+        return Path(os.getenv("APPDATA", "~/AppData/Roaming")).expanduser() / "pypoetry"
+    if sys.platform == "darwin":
+        return Path("~/Library/Application Support/pypoetry").expanduser()
+    return Path(os.getenv("XDG_CONFIG_HOME") or "~/.config").expanduser() / "pypoetry"
+
+
+def _read_toml(path: Path) -> dict[str, Any]:
+    try:
+        with path.open("rb") as fp:
+            return tomli.load(fp)
+    except FileNotFoundError:
+        return {}
+
+
+def _get_poetry_config_value(project_directory: Path, key: str) -> Any:
+    """Read a value from the Poetry configuration the same way Poetry does, i.e. giving precedence to environment
+    variables, then the project-local `poetry.toml` and lastly the global `config.toml`. Returns `None` if the
+    value is not configured."""
+
+    env_value = os.getenv("POETRY_" + re.sub(r"[.-]", "_", key).upper())
+    if env_value is not None:
+        return env_value
+    for config in (
+        _read_toml(project_directory / "poetry.toml"),
+        _read_toml(_get_platform_config_dir() / "config.toml"),
+    ):
+        value: Any = config
+        for part in key.split("."):
+            value = value.get(part) if isinstance(value, dict) else None
+        if value is not None:
+            return value
+    return None
+
+
+def _get_poetry_bool_config_value(project_directory: Path, key: str) -> bool | None:
+    value = _get_poetry_config_value(project_directory, key)
+    if isinstance(value, str):
+        return value.lower() in ("true", "1")
+    return value if value is None else bool(value)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_poetry_virtualenvs_path(project_directory: Path) -> Path:
+    """Returns the value of Poetry's `virtualenvs.path` configuration without invoking Poetry."""
+
+    cache_dir = _get_poetry_config_value(project_directory, "cache-dir") or str(_get_platform_cache_dir())
+    path = _get_poetry_config_value(project_directory, "virtualenvs.path")
+    if path is None:
+        return Path(cache_dir).expanduser() / "virtualenvs"
+    return Path(path.replace("{cache-dir}", cache_dir)).expanduser()
+
+
+@functools.lru_cache(maxsize=None)
+def _get_poetry_base_env_name(project_directory: Path) -> str | None:
+    """Returns the name that Poetry uses for the virtual environments of the project in *project_directory*, minus
+    the `-pyX.Y` suffix. Returns `None` if the package name cannot be determined from the `pyproject.toml`."""
+
+    pyproject = _read_toml(project_directory / "pyproject.toml")
+    name = pyproject.get("project", {}).get("name") or pyproject.get("tool", {}).get("poetry", {}).get("name")
+    if not name:
+        return None
+
+    # This mirrors `EnvManager.generate_env_name()` in Poetry, which receives the canonicalized package name.
+    name = re.sub(r"[-_.]+", "-", name).lower()
+    sanitized_name = re.sub(r'[ $`!*@"\\\r\n\t]', "_", name)[:42]
+    normalized_cwd = os.path.normcase(os.path.realpath(project_directory))
+    hash_str = base64.urlsafe_b64encode(hashlib.sha256(normalized_cwd.encode()).digest()).decode()[:8]
+    return f"{sanitized_name}-{hash_str}"
+
+
+def _find_poetry_environment_path(project_directory: Path) -> Path | None:
+    """Finds the Poetry environment for the project in *project_directory* on the filesystem by replicating the
+    logic that Poetry uses to name and select its environments. Returns `None` if no environment or multiple
+    candidates were found, in which case Poetry needs to be consulted."""
+
+    in_project = _get_poetry_bool_config_value(project_directory, "virtualenvs.in-project")
+    in_project_venv = project_directory / ".venv"
+    if in_project is not False and in_project_venv.is_dir():
+        return in_project_venv
+
+    base_env_name = _get_poetry_base_env_name(project_directory)
+    if base_env_name is None:
+        return None
+
+    virtualenvs_path = _get_poetry_virtualenvs_path(project_directory)
+    if not virtualenvs_path.is_dir():
+        return None
+
+    # Poetry records the Python version of the environment that was last selected with `poetry env use` in
+    # the `envs.toml` file. If there is no such record, Poetry would pick the environment based on the current
+    # Python version; we only know which one that is if there is just one environment.
+    envs = _read_toml(virtualenvs_path / "envs.toml")
+    minor = envs.get(base_env_name, {}).get("minor")
+    if minor:
+        venv_path = virtualenvs_path / f"{base_env_name}-py{minor}"
+        if venv_path.is_dir():
+            return venv_path
+
+    candidates = [path for path in virtualenvs_path.glob(f"{base_env_name}-py*") if path.is_dir()]
+    if len(candidates) != 1:
+        return None
+    return candidates[0]
+
+
+def _get_env_cache_key(project_directory: Path) -> list[Any]:
+    """Returns the key that a cached Poetry environment path for *project_directory* is valid for. It changes
+    when the project's `pyproject.toml` or `poetry.lock` are modified, or when a different Poetry is used."""
+
+    def _mtime(path: Path) -> int | None:
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    return [
+        _mtime(project_directory / "pyproject.toml"),
+        _mtime(project_directory / "poetry.lock"),
+        shutil.which("poetry"),
+    ]
+
+
+def _get_env_cache_file(project_directory: Path) -> Path:
+    digest = hashlib.sha256(str(project_directory.resolve()).encode()).hexdigest()[:16]
+    return _get_user_cache_dir() / "kraken" / "poetry-env" / f"{digest}.json"
+
+
+def _read_env_cache_file(project_directory: Path, cache_key: list[Any]) -> Path | None:
+    """Returns the Poetry environment path that was cached for *project_directory* in a previous build, or `None`
+    if there is no cached path, it was cached for a different *cache_key* or the environment no longer exists."""
+
+    try:
+        data = json.loads(_get_env_cache_file(project_directory).read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("key") != cache_key or not isinstance(data.get("path"), str):
+        return None
+    path = Path(data["path"])
+    return path if path.is_dir() else None
+
+
+def _write_env_cache_file(project_directory: Path, cache_key: list[Any], env_path: Path) -> None:
+    cache_file = _get_env_cache_file(project_directory)
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file.write_text(json.dumps({"key": cache_key, "path": str(env_path)}))
+        os.replace(tmp_file, cache_file)
+    except OSError as exc:
+        logger.debug("Could not write Poetry environment cache file %s (%s)", cache_file, exc)
@@ -2,14 +2,24 @@ from __future__ import annotations
 
 import dataclasses
 import logging
+import os
 from pathlib import Path
 
 from kraken.core import Project
+from kraken.core.util.helpers import NotSet
 
-from .buildsystem import PythonBuildSystem, detect_build_system
+from .buildsystem import PythonBuildSystem, detect_build_system, get_build_system
 
 logger = logging.getLogger(__name__)
 
+#: The attribute on the project that the settings are cached in to avoid searching the project metadata every time
+#: they are requested. (A mapping keyed by the project would keep it alive, as the settings reference the project.)
+_SETTINGS_ATTRIBUTE = "_kraken_std_python_settings"
+
+#: The directories (relative to the project directory) and names in which we look for tests, in order.
+_TESTS_DIRECTORY_PARENTS = (Path(), Path("src"))
+_TESTS_DIRECTORY_NAMES = ("test", "tests")
+
 
 @dataclasses.dataclass
 class PythonIndex:
@@ -32,18 +42,27 @@ class PythonSettings:
     tests_directory: Path | None = None
     package_indexes: dict[str, PythonIndex] = dataclasses.field(default_factory=dict)
     always_use_managed_env: bool = False
+    use_tool_worker: bool = False
+    _detected_tests_directory: Path | None | NotSet = dataclasses.field(
+        default=NotSet.Value, init=False, repr=False, compare=False
+    )
 
     def get_tests_directory(self) -> Path | None:
         """Returns :attr:`tests_directory` if it is set. If not, it will look for the following directories and
         return the first that exists: `test/`, `tests/`, `src/test/`, `src/tests/`. The determined path will be
-        relative to the project directory."""
+        relative to the project directory. The result of the lookup is cached."""
 
         if self.tests_directory:
             return self.tests_directory
-        for test_dir in map(Path, ["test", "tests", "src/test", "src/tests"]):
-            if (self.project.directory / test_dir).is_dir():
-                return test_dir
-        return None
+        if self._detected_tests_directory is NotSet.Value:
+            self._detected_tests_directory = None
+            for parent in _TESTS_DIRECTORY_PARENTS:
+                subdirectories = _get_subdirectories(self.project.directory / parent)
+                test_dir = next((parent / name for name in _TESTS_DIRECTORY_NAMES if name in subdirectories), None)
+                if test_dir is not None:
+                    self._detected_tests_directory = test_dir
+                    break
+        return self._detected_tests_directory
 
     def get_tests_directory_as_args(self) -> list[str]:
         """Returns a list with a single item that is the test directory, or an empty list. This is convenient
@@ -113,29 +132,48 @@ class PythonSettings:
         return self
 
 
+def _get_subdirectories(path: Path) -> set[str]:
+    """Returns the names of the directories in *path* with a single directory listing."""
+
+    try:
+        with os.scandir(path) as entries:
+            return {entry.name for entry in entries if entry.is_dir()}
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+
 def python_settings(
     project: Project | None = None,
-    build_system: PythonBuildSystem | None = None,
+    build_system: PythonBuildSystem | str | None = None,
     source_directory: str | Path | None = None,
     tests_directory: str | Path | None = None,
     always_use_managed_env: bool | None = None,
+    use_tool_worker: bool | None = None,
 ) -> PythonSettings:
     """Read the Python settings for the given or current project and optionally update attributes.
 
     :param project: The project to get the settings for. If not specified, the current project will be used.
-    :environment_handler: If specified, set the :attr:`PythonSettings.environment_handler`. If a string is specified,
-        the following values are currently supported: `"poetry"`.
+    :param build_system: If specified, set the :attr:`PythonSettings.build_system`. If a string is specified,
+        the following values are currently supported: `"poetry"`, `"slap"`. If not specified and no build system
+        is configured yet, it will be detected automatically.
     :param source_directory: The source directory. Defaults to `"src"`.
     :param tests_directory: The tests directory. Automatically determined if left empty.
+    :param use_tool_worker: Run supported Python tools (e.g. Black, Flake8, isort) in a long-lived worker process
+        per environment instead of starting a new Python interpreter for every task. Not supported on Windows.
     """
 
     project = project or Project.current()
-    settings = project.find_metadata(PythonSettings)
+    settings: PythonSettings | None = getattr(project, _SETTINGS_ATTRIBUTE, None)
     if settings is None:
-        settings = PythonSettings(project)
-        project.metadata.append(settings)
-
-    if build_system is None and settings.build_system is None:
+        settings = project.find_metadata(PythonSettings)
+        if settings is None:
+            settings = PythonSettings(project)
+            project.metadata.append(settings)
+        setattr(project, _SETTINGS_ATTRIBUTE, settings)
+
+    if isinstance(build_system, str):
+        build_system = get_build_system(build_system, project.directory)
+    elif build_system is None and settings.build_system is None:
         # Autodetect the environment handler.
         build_system = detect_build_system(project.directory)
         if build_system:
@@ -155,8 +193,12 @@ def python_settings(
 
     if tests_directory is not None:
         settings.tests_directory = Path(tests_directory)
+        settings._detected_tests_directory = NotSet.Value
 
     if always_use_managed_env is not None:
         settings.always_use_managed_env = True
 
+    if use_tool_worker is not None:
+        settings.use_tool_worker = use_tool_worker
+
     return settings
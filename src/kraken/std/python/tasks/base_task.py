@@ -1,9 +1,13 @@
 from __future__ import annotations
 
 import abc
+import functools
 import logging
 import os
+import re
+import shutil
 import subprocess as sp
+from collections import ChainMap
 from typing import Iterable, MutableMapping
 
 from kraken.core import Project, Task, TaskRelationship, TaskStatus
@@ -16,6 +20,36 @@ from ..settings import python_settings
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=None)
+def _which(program: str, path: str | None) -> str | None:
+    return shutil.which(program, path=path)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_script_interpreter(script: str, path: str | None) -> str | None:
+    """Returns the Python interpreter that the console *script* runs with, or `None` if it cannot be determined
+    (e.g. because the script is a shell wrapper)."""
+
+    try:
+        with open(script, "rb") as fp:
+            lines = fp.read(1024).decode(errors="replace").splitlines()
+    except OSError:
+        return None
+    if not lines or not lines[0].startswith("#!"):
+        return None
+    shebang = lines[0][2:].split()
+    if len(shebang) == 2 and os.path.basename(shebang[0]) == "env":
+        interpreter: str | None = _which(shebang[1], path)
+    elif shebang == ["/bin/sh"] and len(lines) > 1 and lines[1].startswith("'''exec' "):
+        # Pip uses this trampoline if the interpreter path is too long for a shebang.
+        interpreter = lines[1].split('"')[1]
+    else:
+        interpreter = shebang[0] if len(shebang) == 1 else None
+    if interpreter is None or not re.match(r"(python|pypy)[\d.]*(\.exe)?$", os.path.basename(interpreter)):
+        return None
+    return interpreter
+
+
 class EnvironmentAwareDispatchTask(Task):
     """Base class for tasks that run a subcommand. The command ensures that the command is aware of the
     environment configured in the project settings."""
@@ -47,18 +81,62 @@ class EnvironmentAwareDispatchTask(Task):
                 logger.warning("Managed environment (%s) does not exist", venv)
                 return
             managed_env = VirtualEnvInfo(venv.get_path())
+            if active_venv is not None and active_venv.path == managed_env.path:
+                logger.debug("Managed environment (%s) is already active", managed_env.path)
+                return
             logger.info("Activating managed environment (%s)", managed_env.path)
             managed_env.activate(environ)
         elif active_venv:
             logger.info("An active virtual environment was found, not activating managed environment")
 
+    def get_execute_environment(self) -> dict[str, str] | None:
+        """Returns the environment variables to run the command with, or `None` if the command can be run with
+        the environment of the current process."""
+
+        # Writes to the ChainMap only go to the first mapping, leaving us with just the variables that the
+        # activation changed. We only need to materialize a full copy of the environment if there are any.
+        overrides: dict[str, str] = {}
+        build_system = self.settings.build_system
+        if build_system and build_system.supports_managed_environments():
+            environ = ChainMap(overrides, os.environ)
+            self.activate_managed_environment(build_system.get_managed_environment(), environ)
+        return {**os.environ, **overrides} if overrides else None
+
     def execute(self) -> TaskStatus:
         command = self.get_execute_command()
         if isinstance(command, TaskStatus):
             return command
-        env = os.environ.copy()
-        if self.settings.build_system and self.settings.build_system.supports_managed_environments():
-            self.activate_managed_environment(self.settings.build_system.get_managed_environment(), env)
+        return self.execute_command(command, self.get_execute_environment())
+
+    def execute_command(self, command: list[str], env: dict[str, str] | None) -> TaskStatus:
+        """Runs the *command* with the environment variables *env* (as returned by :meth:`get_execute_environment`)."""
+
         logger.info("%s", command)
-        result = sp.call(command, cwd=self.project.directory, env=env)
+        if self.settings.use_tool_worker:
+            code = self._execute_in_tool_worker(command, env)
+            if code is not None:
+                return self.handle_exit_code(code)
+        result = sp.call(self._resolve_program(command, env), cwd=self.project.directory, env=env)
         return self.handle_exit_code(result)
+
+    def _resolve_program(self, command: list[str], env: dict[str, str] | None) -> list[str]:
+        # Resolve the program ourselves so the lookup is shared by all tasks that run in the same environment.
+        program = _which(command[0], (env or os.environ).get("PATH"))
+        return command if program is None else [program] + command[1:]
+
+    def _execute_in_tool_worker(self, command: list[str], env: dict[str, str] | None) -> int | None:
+        """Runs the *command* in a worker process for the environment. Returns `None` if the command is not
+        supported by the worker, in which case it must be run in a subprocess instead."""
+
+        if os.name == "nt":
+            return None
+        from ..tool_worker import TOOL_MODULES, get_tool_worker
+
+        # The worker must run with the same interpreter as the program that would be run in a subprocess.
+        path = (env or os.environ).get("PATH")
+        module = TOOL_MODULES.get(command[0])
+        script = _which(command[0], path) if module else None
+        python = _get_script_interpreter(script, path) if script else None
+        if module is None or python is None:
+            return None
+        return get_tool_worker(python, env).run(module, command[1:], self.project.directory)
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import logging
+import os
+import shutil
+import sys
 from pathlib import Path
 from typing import Any, List
 
-from kraken.core import Project, Property
+from kraken.core import Project, Property, TaskStatus
 
 from .base_task import EnvironmentAwareDispatchTask
 
+logger = logging.getLogger(__name__)
+
 
 class MypyTask(EnvironmentAwareDispatchTask):
     description = "Static type checking for Python code using Mypy."
@@ -16,11 +22,24 @@ class MypyTask(EnvironmentAwareDispatchTask):
     use_daemon: Property[bool] = Property.config(default=True)
     python_version: Property[str]
 
-    def get_execute_command(self) -> list[str]:
+    #: If enabled, the `dmypy` client is invoked in the Kraken process instead of a subprocess to save the startup
+    #: time of another Python interpreter. This is only possible if the `dmypy` that would be run is installed in
+    #: the same environment as Kraken and the daemon is already running, otherwise we fall back to a subprocess
+    #: (starting the daemon would fork the Kraken process). Has no effect if :attr:`use_daemon` is disabled.
+    in_process: Property[bool] = Property.config(default=False)
+
+    def __init__(self, name: str, project: Project) -> None:
+        super().__init__(name, project)
+        self._base_command: list[str] | None = None
+
+    def _get_status_file(self) -> Path:
+        return self.project.directory / ".dmypy.json"
+
+    def _get_base_command(self) -> list[str]:
         # TODO (@NiklasRosenstein): Should we somewhere add a task that ensures `.dmypy.json` is in `.gitignore`?
         #       Having it in the project directory makes it easier to just stop the daemon if it malfunctions (which
         #       happens regularly but is hard to detect automatically).
-        status_file = self.project.directory / ".dmypy.json"
+        status_file = self._get_status_file()
         command = ["dmypy", "--status-file", str(status_file), "run", "--"] if self.use_daemon.get() else ["mypy"]
         if self.config_file.is_filled():
             command += ["--config-file", str(self.config_file.get())]
@@ -39,9 +58,69 @@ class MypyTask(EnvironmentAwareDispatchTask):
                     tests_dir.relative_to(source_dir)
                 except ValueError:
                     command += [str(tests_dir)]
-        command += self.additional_args.get()
         return command
 
+    def _execute_dmypy_in_process(self, command: list[str], env: dict[str, str] | None) -> TaskStatus | None:
+        """Runs the `dmypy run` *command* in the current process. Returns `None` if it must be run in a subprocess
+        instead, i.e. if the `dmypy` client that would be run does not belong to the Python environment of the
+        current process, or if the daemon needs to be (re)started. Starting the daemon forks the current process,
+        which must not happen with the Kraken build process."""
+
+        dmypy = shutil.which("dmypy", path=(env or os.environ).get("PATH"))
+        if dmypy is None or not Path(dmypy).parent.samefile(Path(sys.executable).parent):
+            return None
+        try:
+            from mypy.dmypy import client as dmypy_client
+            from mypy.ipc import BadStatus
+            from mypy.version import __version__ as mypy_version
+        except ImportError:
+            return None
+
+        # The client functions below are internal to Mypy and were checked against Mypy 2.4. If their signature
+        # changed in the installed version, we fall back to the subprocess rather than failing the task.
+        status_file = str(self._get_status_file())
+        flags_start = command.index("--") + 1
+        try:
+            if not dmypy_client.is_running(status_file):
+                return None
+            logger.info("%s (in-process)", command)
+            # This is what `dmypy run` does, except that we leave restarting the daemon to the subprocess.
+            response = dmypy_client.request(
+                status_file,
+                "run",
+                version=mypy_version,
+                args=command[flags_start:],
+                export_types=False,
+            )
+        except (AttributeError, TypeError, BadStatus):
+            return None
+        if "restart" in response:
+            logger.info("Mypy daemon needs to be restarted: %s", response["restart"])
+            return None
+        try:
+            dmypy_client.check_output(response, verbose=False, junit_xml=None, perf_stats_file=None)
+            code = 0
+        except (AttributeError, TypeError):
+            return None
+        except SystemExit as exc:
+            code = exc.code if isinstance(exc.code, int) else int(exc.code is not None)
+        return self.handle_exit_code(code)
+
+    # EnvironmentAwareDispatchTask
+
+    def get_execute_command(self) -> list[str]:
+        # The task's properties are finalized by the time it is executed, so we only need to resolve them once.
+        if self._base_command is None:
+            self._base_command = self._get_base_command()
+        return self._base_command + self.additional_args.get()
+
+    def execute_command(self, command: list[str], env: dict[str, str] | None) -> TaskStatus:
+        if self.use_daemon.get() and self.in_process.get():
+            status = self._execute_dmypy_in_process(command, env)
+            if status is not None:
+                return status
+        return super().execute_command(command, env)
+
 
 def mypy(*, name: str = "python.mypy", project: Project | None = None, **kwargs: Any) -> MypyTask:
     project = project or Project.current()
@@ -4,8 +4,6 @@ from pathlib import Path
 from typing import Iterable, List, Optional, Tuple
 
 from kraken.core import Project, Property, Task, TaskRelationship
-from twine.commands.upload import upload as twine_upload
-from twine.settings import Settings as TwineSettings
 
 from ..settings import python_settings
 
@@ -29,6 +27,10 @@ class PublishTask(Task):
         yield from super().get_relationships()
 
     def execute(self) -> None:
+        # Twine takes a while to import, so we only import it when we actually need it.
+        from twine.commands.upload import upload as twine_upload
+        from twine.settings import Settings as TwineSettings
+
         credentials = self.index_credentials.get()
         settings = TwineSettings(
             repository_url=self.index_upload_url.get().rstrip("/") + "/",
@@ -0,0 +1,170 @@
+""" Run Python tools in a long-lived worker process to avoid starting a new Python interpreter for every invocation.
+
+The worker is started by executing this file with the Python interpreter of the environment that the tools should
+run in (which usually does not have Kraken installed), so it must only depend on the standard library. """
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import subprocess as sp
+import sys
+import threading
+import traceback
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+#: Maps the names of the programs that can be run in a worker process to the Python module that implements them.
+#: Pytest is deliberately not included as test suites tend to leave global state behind. Neither is Mypy, as it
+#: terminates the process with `os._exit()`, nor the `dmypy` client, which forks the worker to start the daemon.
+TOOL_MODULES = {
+    "black": "black",
+    "flake8": "flake8",
+    "isort": "isort",
+    "pylint": "pylint",
+}
+
+_WorkerKey = Tuple[str, Optional[Tuple[Tuple[str, str], ...]]]
+_workers: Dict[_WorkerKey, "ToolWorker"] = {}
+_workers_lock = threading.Lock()
+
+
+class ToolWorker:
+    """A handle for a worker process that runs Python modules as `__main__` one after another. Jobs and their results
+    are exchanged through a separate pair of pipes, leaving the standard streams to the tools. This is only supported
+    on POSIX systems."""
+
+    def __init__(self, python: str, env: dict[str, str] | None = None) -> None:
+        """
+        :param python: The Python interpreter to run the worker with.
+        :param env: The environment variables for the worker process.
+        """
+
+        jobs_read, jobs_write = os.pipe()
+        results_read, results_write = os.pipe()
+        try:
+            self._proc = sp.Popen(
+                [python, __file__, str(jobs_read), str(results_write)],
+                pass_fds=(jobs_read, results_write),
+                env=env,
+            )
+        finally:
+            os.close(jobs_read)
+            os.close(results_write)
+        self._jobs = os.fdopen(jobs_write, "wb")
+        self._results = os.fdopen(results_read, "rb")
+        self._lock = threading.Lock()
+
+    def run(self, module: str, argv: list[str], cwd: Path) -> int | None:
+        """Run *module* with the command-line arguments *argv* in the directory *cwd*. Returns the exit code, or
+        `None` if the worker could not run the module (e.g. because it is not installed in the environment)."""
+
+        job = {"module": module, "argv": argv, "cwd": str(cwd)}
+        with self._lock:
+            if self._proc.poll() is not None:
+                return None
+            try:
+                self._jobs.write(json.dumps(job).encode() + b"\n")
+                self._jobs.flush()
+                response = self._results.readline()
+            except OSError:
+                return None
+        if not response:
+            return None
+        code: int | None = json.loads(response)["code"]
+        return code
+
+    def close(self) -> None:
+        """Tell the worker to exit and wait for it."""
+
+        try:
+            self._jobs.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=10)
+        except sp.TimeoutExpired:
+            self._proc.kill()
+        self._results.close()
+
+
+def get_tool_worker(python: str, env: dict[str, str] | None = None) -> ToolWorker:
+    """Returns the worker for the given Python interpreter and environment variables, starting it if needed. All
+    workers are closed when the process exits."""
+
+    key: _WorkerKey = (python, None if env is None else tuple(sorted(env.items())))
+    with _workers_lock:
+        if not _workers:
+            atexit.register(_close_tool_workers)
+        if key not in _workers:
+            _workers[key] = ToolWorker(python, env)
+        return _workers[key]
+
+
+def _close_tool_workers() -> None:
+    with _workers_lock:
+        for worker in _workers.values():
+            worker.close()
+        _workers.clear()
+
+
+def _run_job(job: dict[str, Any], initial_path: list[str]) -> int | None:
+    import importlib.util
+    import runpy
+
+    module = job["module"]
+    try:
+        spec = importlib.util.find_spec(module)
+    except ImportError:
+        spec = None
+    if spec is None:
+        return None
+
+    cwd = os.getcwd()
+    argv = sys.argv
+    os.chdir(job["cwd"])
+    sys.argv = [module] + job["argv"]
+    try:
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+        code = 0
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            code = exc.code or 0
+        else:
+            print(exc.code, file=sys.stderr)
+            code = 1
+    except Exception:
+        traceback.print_exc()
+        code = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.chdir(cwd)
+        sys.argv = argv
+        # Modules imported by the tool are kept, so the next job only re-runs the tool's `__main__` module. They
+        # can not be unloaded anyway, as tools compiled with mypyc (e.g. Black and isort) break when re-imported.
+        sys.path[:] = initial_path
+    return code
+
+
+def main() -> None:
+    # Don't leak the pipes to the parent process into processes started by the tools.
+    jobs_fd, results_fd = int(sys.argv[1]), int(sys.argv[2])
+    os.set_inheritable(jobs_fd, False)
+    os.set_inheritable(results_fd, False)
+    jobs = os.fdopen(jobs_fd, "r")
+    results = os.fdopen(results_fd, "w")
+
+    # Mimic the `sys.path` of a console script rather than exposing the directory that contains this file.
+    sys.path[0] = os.path.dirname(sys.executable)
+
+    initial_path = list(sys.path)
+    for line in jobs:
+        code = _run_job(json.loads(line), initial_path)
+        results.write(json.dumps({"code": code}) + "\n")
+        results.flush()
+
+
+if __name__ == "__main__":
+    main()
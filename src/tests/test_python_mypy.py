@@ -0,0 +1,59 @@
+import os
+import subprocess as sp
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+import pytest
+from kraken.core import Context, Project
+
+from kraken.std.python.tasks.mypy_task import MypyTask
+
+
+@pytest.fixture
+def mypy_task(tempdir: Path, monkeypatch: pytest.MonkeyPatch) -> Iterator[MypyTask]:
+    bin_directory = Path(sys.executable).parent
+    if not (bin_directory / "dmypy").exists():
+        pytest.skip("dmypy is not installed next to the current Python interpreter")
+    monkeypatch.setenv("PATH", str(bin_directory) + os.pathsep + os.environ["PATH"])
+    (tempdir / "src").mkdir()
+    (tempdir / "src" / "module.py").write_text("x: int = 'a'\n")
+    project = Project("test", tempdir, None, Context(tempdir / "build"))
+    task = project.do("mypy", MypyTask, in_process=True)
+    yield task
+    sp.call([sys.executable, "-m", "mypy.dmypy", "--status-file", str(tempdir / ".dmypy.json"), "stop"], cwd=tempdir)
+
+
+def test__MypyTask__in_process_does_not_start_the_daemon(mypy_task: MypyTask) -> None:
+    # Starting the daemon would fork the current process, so it must be left to the subprocess.
+    assert mypy_task._execute_dmypy_in_process(mypy_task.get_execute_command(), None) is None
+    assert not (mypy_task.project.directory / ".dmypy.json").exists()
+
+
+def test__MypyTask__in_process_uses_running_daemon(mypy_task: MypyTask) -> None:
+    directory = mypy_task.project.directory
+    sp.check_call(
+        [sys.executable, "-m", "mypy.dmypy", "--status-file", str(directory / ".dmypy.json"), "start"], cwd=directory
+    )
+    status = mypy_task._execute_dmypy_in_process(mypy_task.get_execute_command(), None)
+    assert status is not None and status.is_failed()
+    (directory / "src" / "module.py").write_text("x: int = 1\n")
+    status = mypy_task._execute_dmypy_in_process(mypy_task.get_execute_command(), None)
+    assert status is not None and status.is_succeeded()
+
+
+def test__MypyTask__in_process_falls_back_if_client_api_changed(
+    mypy_task: MypyTask, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from mypy.dmypy import client as dmypy_client
+
+    # Simulates a Mypy version in which the client does not accept the keyword arguments that we pass.
+    def request(status_file: str, command: str) -> Dict[str, Any]:
+        return {}
+
+    directory = mypy_task.project.directory
+    sp.check_call(
+        [sys.executable, "-m", "mypy.dmypy", "--status-file", str(directory / ".dmypy.json"), "start"], cwd=directory
+    )
+    monkeypatch.setattr(dmypy_client, "request", request)
+    assert mypy_task._execute_dmypy_in_process(mypy_task.get_execute_command(), None) is None
@@ -0,0 +1,101 @@
+import os
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+
+from kraken.std.python.buildsystem import poetry as poetry_module
+from kraken.std.python.buildsystem.poetry import (
+    PoetryManagedEnvironment,
+    _find_poetry_environment_path,
+    _get_deactivated_environ,
+    _get_env_cache_key,
+    _get_poetry_base_env_name,
+    _read_env_cache_file,
+    _write_env_cache_file,
+)
+
+
+@pytest.fixture
+def poetry_project(tempdir: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setenv("POETRY_CONFIG_DIR", str(tempdir / "config"))
+    monkeypatch.setenv("POETRY_VIRTUALENVS_PATH", str(tempdir / "virtualenvs"))
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tempdir / "cache"))
+    project_directory = tempdir / "project"
+    project_directory.mkdir()
+    (project_directory / "pyproject.toml").write_text(
+        dedent(
+            """
+            [tool.poetry]
+            name = "My_Project"
+            version = "0.1.0"
+            """
+        )
+    )
+    return project_directory
+
+
+def test__get_poetry_base_env_name__canonicalizes_name(poetry_project: Path) -> None:
+    name = _get_poetry_base_env_name(poetry_project)
+    assert name is not None
+    assert name.startswith("my-project-")
+    assert len(name) == len("my-project-") + 8
+
+
+def test__find_poetry_environment_path__finds_single_environment(poetry_project: Path, tempdir: Path) -> None:
+    assert _find_poetry_environment_path(poetry_project) is None
+    venv = tempdir / "virtualenvs" / f"{_get_poetry_base_env_name(poetry_project)}-py3.10"
+    venv.mkdir(parents=True)
+    assert _find_poetry_environment_path(poetry_project) == venv
+
+
+def test__find_poetry_environment_path__ambiguous_environments(poetry_project: Path, tempdir: Path) -> None:
+    for version in ("3.10", "3.11"):
+        (tempdir / "virtualenvs" / f"{_get_poetry_base_env_name(poetry_project)}-py{version}").mkdir(parents=True)
+    assert _find_poetry_environment_path(poetry_project) is None
+
+
+def test__find_poetry_environment_path__uses_envs_toml(poetry_project: Path, tempdir: Path) -> None:
+    base_env_name = _get_poetry_base_env_name(poetry_project)
+    for version in ("3.10", "3.11"):
+        (tempdir / "virtualenvs" / f"{base_env_name}-py{version}").mkdir(parents=True)
+    (tempdir / "virtualenvs" / "envs.toml").write_text(f'[{base_env_name}]\nminor = "3.11"\npatch = "3.11.2"\n')
+    assert _find_poetry_environment_path(poetry_project) == tempdir / "virtualenvs" / f"{base_env_name}-py3.11"
+
+
+def test__find_poetry_environment_path__prefers_in_project_environment(poetry_project: Path) -> None:
+    (poetry_project / ".venv").mkdir()
+    assert _find_poetry_environment_path(poetry_project) == poetry_project / ".venv"
+
+
+def test__PoetryManagedEnvironment__caches_path_across_instances(poetry_project: Path) -> None:
+    (poetry_project / ".venv").mkdir()
+    assert PoetryManagedEnvironment(poetry_project).get_path() == poetry_project / ".venv"
+    (poetry_project / ".venv").rmdir()
+    assert PoetryManagedEnvironment(poetry_project).get_path() == poetry_project / ".venv"
+
+
+def test__env_cache_file__is_invalidated_by_cache_key(poetry_project: Path, tempdir: Path) -> None:
+    cache_key = _get_env_cache_key(poetry_project)
+    venv = tempdir / "venv"
+    venv.mkdir()
+    assert _read_env_cache_file(poetry_project, cache_key) is None
+    _write_env_cache_file(poetry_project, cache_key, venv)
+    assert _read_env_cache_file(poetry_project, cache_key) == venv
+    assert _read_env_cache_file(poetry_project, [None, None, None]) is None
+
+
+def test__PoetryManagedEnvironment__poetry_timeout(
+    poetry_project: Path, tempdir: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    poetry = tempdir / "bin" / "poetry"
+    poetry.parent.mkdir()
+    poetry.write_text("#!/bin/sh\nexec sleep 10\n")
+    poetry.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{poetry.parent}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(poetry_module, "_POETRY_ENV_TIMEOUT", 0.1)
+    _get_deactivated_environ.cache_clear()
+    try:
+        assert not PoetryManagedEnvironment(poetry_project).exists()
+    finally:
+        _get_deactivated_environ.cache_clear()
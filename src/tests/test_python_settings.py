@@ -0,0 +1,32 @@
+import gc
+import weakref
+from pathlib import Path
+
+import pytest
+from kraken.core import Context, Project
+
+from kraken.std.python.buildsystem.poetry import PoetryPythonBuildSystem
+from kraken.std.python.settings import python_settings
+
+
+def test__PythonSettings__get_tests_directory(tempdir: Path) -> None:
+    project = Project("test", tempdir, None, Context(tempdir / "build"))
+    (tempdir / "src" / "tests").mkdir(parents=True)
+    assert python_settings(project).get_tests_directory() == Path("src/tests")
+    assert python_settings(project, tests_directory="test").get_tests_directory() == Path("test")
+
+
+def test__python_settings__build_system_by_name(tempdir: Path) -> None:
+    project = Project("test", tempdir, None, Context(tempdir / "build"))
+    assert isinstance(python_settings(project, build_system="poetry").build_system, PoetryPythonBuildSystem)
+    with pytest.raises(ValueError):
+        python_settings(project, build_system="unknown")
+
+
+def test__python_settings__reuses_settings_without_keeping_the_project_alive(tempdir: Path) -> None:
+    project = Project("test", tempdir, None, Context(tempdir / "build"))
+    assert python_settings(project) is python_settings(project)
+    project_ref = weakref.ref(project)
+    del project
+    gc.collect()
+    assert project_ref() is None
@@ -0,0 +1,58 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+from kraken.std.python.tasks.base_task import _get_script_interpreter
+from kraken.std.python.tool_worker import ToolWorker
+
+
+def test__ToolWorker__runs_modules_and_reports_exit_codes(tempdir: Path, capfd: pytest.CaptureFixture[str]) -> None:
+    (tempdir / "mytool.py").write_text(
+        "import os, sys\nprint('output')\nassert os.getcwd() == sys.argv[2]\nsys.exit(int(sys.argv[1]))"
+    )
+    worker = ToolWorker(sys.executable, {**os.environ, "PYTHONPATH": str(tempdir)})
+    try:
+        cwd = Path(os.path.realpath(tempdir))
+        assert worker.run("mytool", ["3", str(cwd)], cwd) == 3
+        assert worker.run("mytool", ["0", str(cwd)], cwd) == 0
+        assert worker.run("mytool", ["0", "/"], cwd) == 1
+        assert worker.run("does_not_exist", [], cwd) is None
+    finally:
+        worker.close()
+    assert capfd.readouterr().out == "output\n" * 3
+
+
+def test__ToolWorker__runs_tool_multiple_times(tempdir: Path) -> None:
+    # isort is compiled with mypyc, which does not support re-importing its modules in the same process.
+    (tempdir / "module.py").write_text("import sys\nimport os\n")
+    worker = ToolWorker(sys.executable)
+    try:
+        assert worker.run("isort", ["--check", "module.py"], tempdir) == 1
+        assert worker.run("isort", ["module.py"], tempdir) == 0
+        assert worker.run("isort", ["--check", "module.py"], tempdir) == 0
+    finally:
+        worker.close()
+    assert (tempdir / "module.py").read_text() == "import os\nimport sys\n"
+
+
+def test__get_script_interpreter__reads_shebang(tempdir: Path) -> None:
+    python = tempdir / "bin" / "python3"
+    python.parent.mkdir()
+    python.touch(mode=0o755)
+    script = tempdir / "black"
+    script.write_text(f"#!{python}\n")
+    assert _get_script_interpreter(str(script), None) == str(python)
+    script = tempdir / "flake8"
+    script.write_text("#!/usr/bin/env python3\n")
+    assert _get_script_interpreter(str(script), str(python.parent)) == str(python)
+    script = tempdir / "isort"
+    script.write_text(f"#!/bin/sh\n'''exec' \"{python}\" \"$0\" \"$@\"\n' '''\n")
+    assert _get_script_interpreter(str(script), None) == str(python)
+
+
+def test__get_script_interpreter__rejects_non_python_scripts(tempdir: Path) -> None:
+    script = tempdir / "black"
+    script.write_text('#!/usr/bin/env bash\nexec pyenv exec black "$@"\n')
+    assert _get_script_interpreter(str(script), None) is None